@@ -3,6 +3,7 @@
 # Central configuration file for the factor replication project.
 #
 
+import datetime
 from pathlib import Path
 
 # --- Project Structure ---
@@ -15,6 +16,13 @@ START_DATE_STR = '2020-01-01' # setting 1
 # START_DATE_STR = '1963-07-01' # setting 2
 # START_DATE_STR = '2000-01-01' # setting 3
 
+# 'YYYYMM' labels for the data period, used in data and plot paths.
+START_FNAME = datetime.datetime.strptime(START_DATE_STR, '%Y-%m-%d').strftime('%Y%m')
+END_FNAME = datetime.date.today().strftime('%Y%m')
+
+# The raw characteristic data, stored as a Parquet dataset partitioned by 'eom_year'.
+CHAR_DATA_DIR = PROJECT_ROOT / "data" / "raw" / "char" / f"jkp_char_usa_{START_FNAME}_{END_FNAME}"
+
 # --- Validation Settings ---
 # The correlation threshold to determine a successful replication.
 CORRELATION_THRESHOLD = 0.95
@@ -36,4 +44,8 @@ SCHEMES = {
     'vw_cap': PROJECT_ROOT / "data/raw/factor/usa_all_factors_monthly_vw_cap.csv",
     'ew': PROJECT_ROOT / "data/raw/factor/usa_all_factors_monthly_ew.csv",
     'vw': PROJECT_ROOT / "data/raw/factor/usa_all_factors_monthly_vw.csv",
-}
\ No newline at end of file
+}
+
+# The benchmark files for all schemes combined into one long-format Parquet
+# file (with a 'scheme' column) during ingestion.
+BENCHMARK_DATA_FILE = PROJECT_ROOT / "data/raw/factor/usa_all_factors_monthly.parquet"
\ No newline at end of file
@@ -1,16 +1,21 @@
 # inspect_benchmark.py
 import polars as pl
-from pathlib import Path
 
-# Define the path to your benchmark file
-project_root = Path(__file__).resolve().parent
-benchmark_file = project_root / "data" / "raw" / "factor" / "usa_all_factors_monthly_vw_cap.csv"
+from config.settings import BENCHMARK_DATA_FILE
+from src.runner import prepare_benchmark_data
 
-# Load the data
-df = pl.read_csv(benchmark_file)
+# Build the combined benchmark file from the downloaded CSVs if needed
+prepare_benchmark_data()
 
-# Get and print all unique factor names
-unique_names = df.get_column('name').unique().sort()
+# Scan only the dictionary-encoded 'name' column and get all unique factor names
+unique_names = (
+    pl.scan_parquet(BENCHMARK_DATA_FILE)
+    .select(pl.col('name').cast(pl.String))
+    .unique()
+    .sort('name')
+    .collect(engine='streaming')
+    .get_column('name')
+)
 
 print("Available factor names in the benchmark file:")
 for name in unique_names:
@@ -4,12 +4,12 @@
 #
 
 import argparse
-from src import runner
+from src import diagnostics, runner
 
 def main():
     """
     Parses command-line arguments and calls the appropriate
-    runner function to execute a workflow.
+    function to execute a workflow.
     """
     parser = argparse.ArgumentParser(description="Factor Replication Project CLI")
     
@@ -22,6 +22,10 @@ def main():
     # Command to run the full replication and validation workflow.
     subparsers.add_parser('run-replication', help='Run the full factor replication and validation workflow on existing data.')
 
+    # Command to run the portfolio composition diagnostics.
+    diagnostics_parser = subparsers.add_parser('run-diagnostics', help='Plot the composition of factor portfolios over time.')
+    diagnostics_parser.add_argument('--characteristic', default='ret_12_1', help='Characteristic to analyze.')
+
     args = parser.parse_args()
 
     # Call the correct function from the runner based on the command.
@@ -29,6 +33,8 @@ def main():
         runner.run_data_ingestion()
     elif args.command == 'run-replication':
         runner.run_replication_workflow()
+    elif args.command == 'run-diagnostics':
+        diagnostics.run_diagnostics(characteristic=args.characteristic)
     else:
         parser.print_help()
 
@@ -4,12 +4,13 @@
 #
 
 import logging
+import shutil
 import sys
 from pathlib import Path
-from typing import List, Optional
-import datetime
+from typing import Dict, List, Optional
 
 import polars as pl
+import polars.selectors as cs
 import wrds
 
 # Import settings from our central config files
@@ -35,18 +36,33 @@ def setup_logger():
 
 logger = setup_logger()
 
+# Parquet writer settings for ingested files. Column statistics allow later
+# scans to skip row groups on 'eom' and 'name' predicates.
+PARQUET_WRITE_OPTIONS = {
+    "compression": "snappy",
+    "statistics": True,
+}
+
+# Number of rows fetched from WRDS and written to Parquet at a time.
+WRDS_BATCH_SIZE = 500_000
+
 def download_jkp_char_data(
     characteristics: List[str],
     output_path: Path,
     wrds_username: Optional[str] = WRDS_USERNAME,
-    start_date: Optional[str] = None,
+    start_date: Optional[str] = settings.START_DATE_STR,
     country: str = 'USA',
     filter_common: bool = True,
     filter_exch_main: bool = True,
     filter_primary_sec: bool = True,
     filter_obs_main: bool = True,
 ) -> None:
-    """Connects to WRDS and downloads specified firm characteristics data."""
+    """
+    Connects to WRDS and downloads specified firm characteristics data.
+    The data is saved to output_path as a Parquet dataset partitioned by
+    'eom_year'. Only the required columns from start_date onwards (the
+    configured START_DATE_STR by default) are requested from the server.
+    """
     logger.info("--- Starting JKP Characteristic Data Download ---")
 
     if not wrds_username or wrds_username == "your_username_here":
@@ -55,6 +71,7 @@ def download_jkp_char_data(
         raise ValueError(error_msg)
 
     db = None
+    tmp_path = None
     try:
         logger.info(f"Connecting to WRDS with username: {wrds_username}...")
         db = wrds.Connection(wrds_username=wrds_username)
@@ -75,45 +92,135 @@ def download_jkp_char_data(
         if start_date: filters.append(f"eom >= '{start_date}'")
         filters_str = "\n            AND ".join(filters)
 
-        query = f"SELECT {columns_str} FROM contrib.global_factor WHERE {filters_str}"
+        # Order by month so each batch covers a contiguous range of years and
+        # every year partition is made up of as few files as possible.
+        query = f"SELECT {columns_str} FROM contrib.global_factor WHERE {filters_str} ORDER BY eom"
         logger.info(f"Executing query for characteristics: {unique_chars}")
         
-        pandas_df = db.raw_sql(query, date_cols=["eom"])
-        logger.info("Query executed successfully. Fetched %d rows and %d columns.", pandas_df.shape[0], pandas_df.shape[1])
+        # Fix the dtype of every column so every batch is written with the
+        # same schema, even if a column happens to be all-null in a batch.
+        # Characteristics and market equity are only used for sorting and
+        # weighting, so they are stored as float32 to halve their size; returns
+        # keep full precision.
+        column_dtypes = {
+            "eom": pl.Date,
+            "id": pl.Int64,
+            "permno": pl.UInt32,
+            "crsp_exchcd": pl.Int64,
+            "source_crsp": pl.Int64,
+            "size_grp": pl.String,
+            "ret_exc_lead1m": pl.Float64,
+            **{c: pl.Float32 for c in unique_chars + ["me"]},
+        }
+
+        # Write a Hive-partitioned dataset by year so date-filtered scans can skip whole files.
+        # Batches go to a temporary sibling directory that only replaces the existing
+        # dataset once the download has finished, so a failed run leaves it untouched.
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path)
+        tmp_path.mkdir(parents=True)
+
+        # Stream the result in batches over a server-side cursor, reading straight
+        # into Polars and writing each batch out, so peak memory is one batch.
+        batches = pl.read_database(
+            query,
+            connection=db.connection.execution_options(stream_results=True),
+            iter_batches=True,
+            batch_size=WRDS_BATCH_SIZE,
+            infer_schema_length=None,
+        )
+        n_rows = 0
+        for batch_idx, batch_df in enumerate(batches):
+            # NUMERIC columns arrive as Decimal; cast them to floats as raw_sql would have.
+            batch_df = batch_df.with_columns(cs.decimal().cast(pl.Float64)).cast(column_dtypes)
+            batch_df = batch_df.with_columns(pl.col('eom').dt.year().alias('eom_year'))
+            for (eom_year,), year_df in batch_df.partition_by('eom_year', as_dict=True, include_key=False).items():
+                partition_dir = tmp_path / f"eom_year={eom_year}"
+                partition_dir.mkdir(exist_ok=True)
+                year_df.write_parquet(partition_dir / f"part-{batch_idx:05d}.parquet", **PARQUET_WRITE_OPTIONS)
+            n_rows += batch_df.height
+            logger.info("Fetched and saved batch %d (%d rows, %d total).", batch_idx, batch_df.height, n_rows)
+
+        if n_rows == 0:
+            raise ValueError("WRDS query returned no rows; keeping the existing dataset.")
+
+        # Swap the completed dataset in, keeping the old one until the rename succeeds.
+        old_path = output_path.with_name(output_path.name + ".old")
+        if old_path.exists():
+            shutil.rmtree(old_path)
+        if output_path.exists():
+            output_path.rename(old_path)
+        tmp_path.rename(output_path)
+        if old_path.exists():
+            shutil.rmtree(old_path)
+        logger.info("Data saved successfully to %s. Rows: %d", output_path, n_rows)
 
     except Exception as e:
         logger.error("An error occurred during WRDS data download.", exc_info=True)
+        if tmp_path is not None and tmp_path.exists():
+            shutil.rmtree(tmp_path, ignore_errors=True)
         raise e
     finally:
         if db:
             db.close()
             logger.info("WRDS connection closed.")
 
+    logger.info("--- Characteristic Data Download Complete ---")
+
+def combine_benchmark_files(benchmark_files: Dict[str, Path], output_path: Path) -> None:
+    """
+    Combines the JKP benchmark factor CSVs downloaded from jkpfactors.com into
+    a single long-format Parquet file with a 'scheme' column, so validation
+    can load every scheme's benchmarks with one scan.
+
+    Args:
+        benchmark_files (Dict[str, Path]): Mapping of weighting scheme to the
+                                           scheme's benchmark CSV.
+        output_path (Path): Path of the combined Parquet file.
+    """
+    logger.info("--- Combining JKP Benchmark Factor Files into Parquet ---")
+
+    missing_files = [str(path) for path in benchmark_files.values() if not path.exists()]
+    if missing_files:
+        error_msg = f"Benchmark CSV(s) not found: {missing_files}"
+        logger.error(error_msg)
+        raise FileNotFoundError(error_msg)
+
+    # Scan all CSVs lazily so Polars can parse them in parallel, then stream
+    # the combined table straight into Parquet without materializing it.
+    lazy_frames = [
+        pl.scan_csv(path, try_parse_dates=True).with_columns(
+            pl.lit(scheme).alias('scheme'),
+            # Categorical columns are dictionary-encoded in Parquet, which keeps
+            # listing the distinct factor names cheap.
+            pl.col('name').cast(pl.Categorical),
+        )
+        for scheme, path in benchmark_files.items()
+    ]
+    # Write to a temporary file first so an interrupted run never leaves a
+    # partial file at output_path.
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
     try:
-        polars_df = pl.from_pandas(pandas_df)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        polars_df.write_parquet(output_path)
-        logger.info("Data saved successfully to %s. Shape: %s", output_path, polars_df.shape)
+        pl.concat(lazy_frames, how='vertical_relaxed').sink_parquet(tmp_path, **PARQUET_WRITE_OPTIONS)
+        tmp_path.replace(output_path)
     except Exception as e:
-        logger.error("Failed to convert or save data.", exc_info=True)
+        logger.error("Failed to combine benchmark files.", exc_info=True)
+        tmp_path.unlink(missing_ok=True)
         raise e
+    logger.info("Combined %d benchmark files into %s.", len(lazy_frames), output_path)
 
-    logger.info("--- Characteristic Data Download Complete ---")
+    logger.info("--- Benchmark Combination Complete ---")
 
 if __name__ == "__main__":
-    end_date_str = datetime.date.today().strftime('%Y-%m-%d')
-    start_fname = datetime.datetime.strptime(settings.START_DATE_STR, '%Y-%m-%d').strftime('%Y%m')
-    end_fname = datetime.datetime.strptime(end_date_str, '%Y-%m-%d').strftime('%Y%m')
-    output_filename = f"jkp_char_usa_{start_fname}_{end_fname}.parquet"
-    output_file_path = settings.PROJECT_ROOT / "data" / "raw" / "char" / output_filename
-
     # Extract the unique characteristics from the full list of factors.
     characteristics_list = list(set(char for char, _, _ in settings.FACTORS_TO_REPLICATE))
 
     try:
         download_jkp_char_data(
             characteristics=characteristics_list,
-            output_path=output_file_path,
+            output_path=settings.CHAR_DATA_DIR,
             start_date=settings.START_DATE_STR,
         )
     except Exception:
@@ -5,33 +5,39 @@
 
 import polars as pl
 
-def validate_raw_data(df: pl.DataFrame) -> None:
+def validate_raw_data(lf: pl.LazyFrame) -> None:
     """
     Performs a series of validation checks on the raw characteristic data.
     Raises a ValueError for critical failures but only warns for non-critical issues.
     
+    Only the aggregates needed for the checks are collected, so the full
+    dataset is never loaded into memory.
+    
     Args:
-        df (pl.DataFrame): The raw data to validate.
+        lf (pl.LazyFrame): A lazy scan of the raw data to validate.
     """
     print("--- Running Raw Data Validation Checks ---")
+
+    critical_id_cols = ['eom', 'id']
+    data_cols_to_check = ['me', 'ret_exc_lead1m']
+    stats = lf.select(
+        pl.col(critical_id_cols + data_cols_to_check).is_null().sum().name.suffix('_nulls'),
+        pl.col('ret_exc_lead1m').abs().max().alias('max_abs_ret'),
+    ).collect(engine='streaming').row(0, named=True)
         
     # Check 1: Critical identifiers. These MUST NOT be null.
-    critical_id_cols = ['eom', 'id']
-    id_null_counts = df.select(pl.col(critical_id_cols).is_null().sum()).row(0)
-    for i, col in enumerate(critical_id_cols):
-        if id_null_counts[i] > 0:
-            raise ValueError(f"CRITICAL Validation failed: Column '{col}' contains {id_null_counts[i]} null values.")
+    for col in critical_id_cols:
+        if stats[f'{col}_nulls'] > 0:
+            raise ValueError(f"CRITICAL Validation failed: Column '{col}' contains {stats[f'{col}_nulls']} null values.")
 
     # Check 2: Important data columns. Nulls are undesirable but can be cleaned
-    data_cols_to_check = ['me', 'ret_exc_lead1m']
-    data_null_counts = df.select(pl.col(data_cols_to_check).is_null().sum()).row(0)
-    for i, col in enumerate(data_cols_to_check):
-        if data_null_counts[i] > 0:
-            print(f"Warning: Column '{col}' contains {data_null_counts[i]} null values. These will be dropped in the portfolio construction step.")
+    for col in data_cols_to_check:
+        if stats[f'{col}_nulls'] > 0:
+            print(f"Warning: Column '{col}' contains {stats[f'{col}_nulls']} null values. These will be dropped in the portfolio construction step.")
             
     # Check 3: Check for unrealistic return values.
-    max_ret = df.select(pl.col('ret_exc_lead1m').abs().max()).item()
-    if max_ret > 10.0:
+    max_ret = stats['max_abs_ret']
+    if max_ret is not None and max_ret > 10.0:
         print(f"Warning: Maximum absolute monthly return is {(max_ret*100):.2f}%, which is unusually high.")
 
     print("Raw data validation checks complete.")
\ No newline at end of file
@@ -5,7 +5,6 @@
 import polars as pl
 import matplotlib.pyplot as plt
 from config import settings
-from src.runner import get_data_filepath
 
 def run_diagnostics(characteristic: str, weighting_scheme: str = 'ew'):
     """
@@ -18,11 +17,10 @@ def run_diagnostics(characteristic: str, weighting_scheme: str = 'ew'):
     print(f"--- Running Diagnostics for: {characteristic} ({weighting_scheme.upper()}) ---")
     
     # --- This logic is copied from the start of construct_factor_portfolio ---
-    char_data_file = get_data_filepath()
     required_cols = ['eom', 'permno', 'crsp_exchcd', 'me', characteristic]
     all_cols = list(dict.fromkeys(required_cols))
     
-    char_df = pl.read_parquet(char_data_file, columns=all_cols).drop_nulls(subset=[characteristic, 'me'])
+    char_df = pl.scan_parquet(settings.CHAR_DATA_DIR, hive_partitioning=True).select(all_cols).drop_nulls(subset=[characteristic, 'me'])
 
     if characteristic == 'be_me':
         char_df = char_df.filter(pl.col(characteristic) > 0)
@@ -55,7 +53,7 @@ def run_diagnostics(characteristic: str, weighting_scheme: str = 'ew'):
         pl.len().alias('n_stocks'),
         pl.mean('me').alias('avg_me_usd_mil'),
         pl.mean(characteristic).alias(f'avg_{characteristic}')
-    ).sort('eom').to_pandas()
+    ).sort('eom').collect(engine='streaming').to_pandas()
 
     # --- Plot the results ---
     metrics = ['n_stocks', 'avg_me_usd_mil', f'avg_{characteristic}']
@@ -3,26 +3,41 @@
 # Functions for constructing long-short factor portfolios.
 #
 
+import datetime
+from typing import Optional
+
 import polars as pl
-from pathlib import Path
 
 def construct_factor_portfolio(
-    char_data_path: Path,
+    char_data: pl.DataFrame | pl.LazyFrame,
     characteristic: str,
     factor_name: str,
     weighting_scheme: str = 'vw_cap',
     long_short_direction: str = 'long',
-) -> pl.DataFrame:
+    start_date: Optional[str] = None,
+) -> pl.LazyFrame:
     """
     Constructs a long-short factor portfolio based on a single characteristic,
     supporting multiple weighting schemes and return winsorization.
+
+    The characteristic data is normally a lazy Parquet scan shared across
+    factors (an in-memory DataFrame also works), and only the columns and
+    months needed for this factor are read from it. The result is returned
+    as a LazyFrame so that callers can collect many factors together.
     """
     base_cols = ['eom', 'permno', 'crsp_exchcd', 'source_crsp', 'size_grp', 'me', 'ret_exc_lead1m']
     all_cols = base_cols + [characteristic]
     required_cols = list(dict.fromkeys(all_cols))
     
+    # Push the column projection and date filter down into the scan.
+    char_lf = char_data.lazy().select(required_cols)
+    if start_date:
+        char_lf = char_lf.filter(
+            pl.col('eom') >= datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
+        )
+
     # Add stricter initial screen to match the original R code.
-    char_df = pl.read_parquet(char_data_path, columns=required_cols).drop_nulls(
+    char_df = char_lf.drop_nulls(
         subset=[characteristic, 'me', 'size_grp', 'ret_exc_lead1m']
     )
 
@@ -103,8 +118,14 @@ def construct_factor_portfolio(
         pl.len().alias('n_stocks')
     ).sort('eom')
     
-    portfolio_returns_wide = portfolio_returns.pivot(
-        index='eom', columns='portfolio', values=['port_ret', 'n_stocks']
+    # Pivot the Low/High legs into columns. LazyFrames have no pivot, so each
+    # leg is picked out with a filtered aggregation per month instead.
+    portfolio_returns_wide = portfolio_returns.group_by('eom').agg(
+        *[
+            pl.col(value_col).filter(pl.col('portfolio') == leg).first().alias(f'{value_col}_{leg}')
+            for value_col in ['port_ret', 'n_stocks']
+            for leg in ['Low', 'High']
+        ]
     ).sort('eom').filter(
         (pl.col('n_stocks_Low') >= 5) & (pl.col('n_stocks_High') >= 5)
     )
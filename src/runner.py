@@ -4,40 +4,44 @@
 #
 
 import datetime
-from pathlib import Path
 import polars as pl
 
 # Import project modules and central settings
 from config import settings
-from src.data_ingestion import download_jkp_char_data
+from src.data_ingestion import combine_benchmark_files, download_jkp_char_data
 from src.data_validation import validate_raw_data
 from src.portfolio_construction import construct_factor_portfolio
-from src.validation import validate_factor
-
-def get_data_filepath() -> Path:
-    """
-    Constructs the filepath for the raw characteristic data parquet file
-    based on the start date in the settings.
-    """
-    start_fname = datetime.datetime.strptime(settings.START_DATE_STR, '%Y-%m-%d').strftime('%Y%m')
-    end_fname = datetime.date.today().strftime('%Y%m')
-    char_data_filename = f"jkp_char_usa_{start_fname}_{end_fname}.parquet"
-    return settings.PROJECT_ROOT / "data" / "raw" / "char" / char_data_filename
+from src.validation import load_benchmark_factors, validate_factor
 
 def run_data_ingestion():
     """Runs the full data ingestion and validation pipeline."""
-    char_data_file = get_data_filepath()
-    
     characteristics_to_download = list(set(char for char, _, _ in settings.FACTORS_TO_REPLICATE))
     
     download_jkp_char_data(
         characteristics=characteristics_to_download,
-        output_path=char_data_file,
+        output_path=settings.CHAR_DATA_DIR,
         start_date=settings.START_DATE_STR,
     )
     
-    raw_df = pl.read_parquet(char_data_file)
-    validate_raw_data(raw_df)
+    validate_raw_data(pl.scan_parquet(settings.CHAR_DATA_DIR, hive_partitioning=True))
+
+def prepare_benchmark_data():
+    """
+    Builds the combined benchmark Parquet file from the scheme CSVs if it is
+    missing, older than any of them, or built for a different set of schemes.
+    """
+    output_path = settings.BENCHMARK_DATA_FILE
+    if output_path.exists():
+        output_mtime = output_path.stat().st_mtime
+        is_fresh = all(path.stat().st_mtime <= output_mtime for path in settings.SCHEMES.values() if path.exists())
+        try:
+            built_schemes = set(pl.scan_parquet(output_path).select('scheme').unique().collect().get_column('scheme'))
+        except Exception:
+            built_schemes = set()
+        if is_fresh and built_schemes == set(settings.SCHEMES):
+            return
+
+    combine_benchmark_files(settings.SCHEMES, output_path)
 
 def print_summary_table(results: list):
     """
@@ -72,53 +76,82 @@ def run_replication_workflow():
     """Runs the full factor replication and validation workflow."""
     print("--- Starting Full Factor Replication and Validation Workflow ---")
     
-    char_data_file = get_data_filepath()
     replicated_output_dir = settings.PROJECT_ROOT / "data" / "processed"
     replicated_output_dir.mkdir(parents=True, exist_ok=True)
     
-    start_fname = datetime.datetime.strptime(settings.START_DATE_STR, '%Y-%m-%d').strftime('%Y%m')
-    end_fname = datetime.date.today().strftime('%Y%m')
-    plot_subdir = f"{start_fname}-{end_fname}"
+    plot_subdir = f"{settings.START_FNAME}-{settings.END_FNAME}"
 
-    # Create a list to store results for the final summary.
-    all_results = []
+    # Build the combined benchmark file first so a missing CSV fails fast,
+    # before the expensive portfolio construction.
+    prepare_benchmark_data()
 
-    for scheme, benchmark_path in settings.SCHEMES.items():
-        print(f"\n{'='*20} RUNNING SCHEME: {scheme.upper()} {'='*20}")
+    # Scan the characteristic data lazily so the streaming engine reads it from
+    # disk in batches. Only the year partitions from the start date onwards are read.
+    start_year = datetime.datetime.strptime(settings.START_DATE_STR, '%Y-%m-%d').year
+    char_data = pl.scan_parquet(settings.CHAR_DATA_DIR, hive_partitioning=True).filter(
+        pl.col('eom_year') >= start_year
+    )
 
+    # Build the lazy query for every (scheme, factor) pair up front.
+    jobs = []
+    queries = []
+    for scheme in settings.SCHEMES:
         for characteristic, factor_name, direction in settings.FACTORS_TO_REPLICATE:
-            print(f"\n--- Processing Factor: {factor_name} ({scheme.upper()}) ---")
-
             replicated_factor_name = f"{factor_name}_{scheme.upper()}"
-
-            replicated_returns = construct_factor_portfolio(
-                char_data_path=char_data_file,
+            jobs.append((scheme, factor_name, replicated_factor_name))
+            queries.append(construct_factor_portfolio(
+                char_data=char_data,
                 characteristic=characteristic,
                 factor_name=replicated_factor_name,
                 weighting_scheme=scheme,
-                long_short_direction=direction
-            )
-            
-            output_path = replicated_output_dir / f"{replicated_factor_name.lower()}_replicated.parquet"
-            replicated_returns.write_parquet(output_path)
-            print(f"Replicated returns saved to {output_path}")
-
-            # The validation function now returns the correlation value.
-            correlation = validate_factor(
-                replicated_returns=replicated_returns,
-                benchmark_path=benchmark_path,
-                benchmark_factor_name=factor_name,
-                plot_subdir=plot_subdir,
-                correlation_threshold=settings.CORRELATION_THRESHOLD
-            )
-            
-            # Append the result to our summary list.
-            if correlation is not None:
-                all_results.append({
-                    "Factor": factor_name,
-                    "Scheme": scheme,
-                    "Correlation": correlation
-                })
+                long_short_direction=direction,
+                start_date=settings.START_DATE_STR,
+            ))
+
+    # Collect all portfolios in one call so Polars can run them in parallel
+    # and share common subplans (e.g. the characteristic scan) between them.
+    # The streaming engine reads the scan in batches to bound peak memory.
+    print(f"\nConstructing {len(queries)} factor portfolios...")
+    all_replicated_returns = pl.collect_all(queries, engine='streaming')
+
+    # Save every replicated series before validation so a benchmark problem
+    # cannot discard the computed results.
+    for (_, _, replicated_factor_name), replicated_returns in zip(jobs, all_replicated_returns):
+        output_path = replicated_output_dir / f"{replicated_factor_name.lower()}_replicated.parquet"
+        replicated_returns.write_parquet(output_path)
+        print(f"Replicated returns saved to {output_path}")
+
+    # Load the benchmarks for every scheme once and reuse them for all factors.
+    benchmark_factor_names = [factor_name for _, factor_name, _ in settings.FACTORS_TO_REPLICATE]
+    benchmark_factors = load_benchmark_factors(settings.BENCHMARK_DATA_FILE, benchmark_factor_names)
+
+    # Create a list to store results for the final summary.
+    all_results = []
+    current_scheme = None
+
+    for (scheme, factor_name, _), replicated_returns in zip(jobs, all_replicated_returns):
+        if scheme != current_scheme:
+            print(f"\n{'='*20} RUNNING SCHEME: {scheme.upper()} {'='*20}")
+            current_scheme = scheme
+
+        print(f"\n--- Processing Factor: {factor_name} ({scheme.upper()}) ---")
+
+        # The validation function now returns the correlation value.
+        correlation = validate_factor(
+            replicated_returns=replicated_returns,
+            benchmark_factor=benchmark_factors.get((scheme, factor_name)),
+            benchmark_factor_name=factor_name,
+            plot_subdir=plot_subdir,
+            correlation_threshold=settings.CORRELATION_THRESHOLD
+        )
+        
+        # Append the result to our summary list.
+        if correlation is not None:
+            all_results.append({
+                "Factor": factor_name,
+                "Scheme": scheme,
+                "Correlation": correlation
+            })
 
     # Print the final summary table at the very end.
     if all_results:
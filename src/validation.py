@@ -8,6 +8,8 @@ import polars as pl
 import numpy as np
 import matplotlib.pyplot as plt
 
+from config import settings
+
 def plot_cumulative_returns(df: pl.DataFrame, factor_name: str, plot_subdir: str):
     """
     Generates and saves a plot of cumulative factor returns into a specific subdirectory.
@@ -31,7 +33,7 @@ def plot_cumulative_returns(df: pl.DataFrame, factor_name: str, plot_subdir: str
     
     fig.tight_layout()
     
-    output_dir = Path("plots") / plot_subdir
+    output_dir = settings.PROJECT_ROOT / "plots" / plot_subdir
     output_dir.mkdir(parents=True, exist_ok=True)
     
     plot_filename = f"{factor_name.lower()}.png"
@@ -41,24 +43,35 @@ def plot_cumulative_returns(df: pl.DataFrame, factor_name: str, plot_subdir: str
     print(f"Performance plot saved to: {plot_path}")
     plt.close(fig)
 
+def load_benchmark_factors(benchmark_path: Path, factor_names: list[str]) -> dict[tuple[str, str], pl.DataFrame]:
+    """
+    Loads the requested factors for every scheme from the combined benchmark
+    file in a single pass.
+
+    Returns a dictionary mapping each (scheme, factor name) pair to its
+    benchmark returns (columns 'eom' and 'benchmark_ret'), so the file is
+    read once for the whole workflow.
+    """
+    benchmark_df = pl.scan_parquet(benchmark_path).filter(
+        pl.col('name').is_in(factor_names)
+    ).select(['scheme', 'name', 'date', 'ret']).rename({'ret': 'benchmark_ret', 'date': 'eom'}).collect(engine='streaming')
+
+    return benchmark_df.partition_by(['scheme', 'name'], as_dict=True, include_key=False)
+
 def validate_factor(
     replicated_returns: pl.DataFrame,
-    benchmark_path: Path,
+    benchmark_factor: pl.DataFrame | None,
     benchmark_factor_name: str,
     plot_subdir: str,
     correlation_threshold: float = 0.95
 ) -> float | None:
     """
-    Validates a replicated factor against its benchmark.
+    Validates a replicated factor against its benchmark returns, as loaded
+    by load_benchmark_factors.
     Returns the correlation value if successful, otherwise None.
     """
-    try:
-        benchmark_df = pl.read_csv(benchmark_path, try_parse_dates=True)
-        benchmark_factor = benchmark_df.filter(
-            pl.col('name') == benchmark_factor_name
-        ).select(['date', 'ret']).rename({'ret': 'benchmark_ret', 'date': 'eom'})
-    except Exception as e:
-        print(f"Error loading or processing benchmark data: {e}")
+    if benchmark_factor is None:
+        print(f"Validation failed: Benchmark factor '{benchmark_factor_name}' not found.")
         return None
 
     # Align dates for comparison.